@@ -4,6 +4,7 @@
 # dependencies = [
 #     "typer[all]>=0.20.0",
 #     "pydantic>=2.12.0",
+#     "orjson>=3.10.0",
 # ]
 # ///
 """
@@ -15,24 +16,59 @@ Usage:
 
 from __future__ import annotations
 
-import ast
+import functools
+import heapq
 import json
-import re
+import os
+import string
 import sys
-import tempfile
-import uuid
+from collections import OrderedDict
 from pathlib import Path
-from typing import Annotated, Any, Literal
+from typing import TYPE_CHECKING, Annotated, Any, Literal, cast
 
-import typer
-from pydantic import BaseModel, Field, ValidationError, field_validator
+if TYPE_CHECKING:
+    from collections.abc import Set as AbstractSet
 
 __version__ = "2.0.2"
 
+
+def _version_json() -> str:
+    return json.dumps({"version": __version__})
+
+
+# A bare --version needs neither Typer nor Pydantic, whose imports and model
+# builds dominate startup, so answer it before loading them
+if __name__ == "__main__" and sys.argv[1:] in (["--version"], ["-v"]):
+    print(_version_json())
+    sys.exit(0)
+
+import typer  # noqa: E402
+from pydantic import (  # noqa: E402
+    BaseModel,
+    Field,
+    PrivateAttr,
+    TypeAdapter,
+    ValidationError,
+    ValidationInfo,
+    field_validator,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup outside `uv run`
+    _HAS_ORJSON = False
+else:
+    _HAS_ORJSON = True
+
 # =============================================================================
 # Models
 # =============================================================================
 
+# Kept as a string for Field(pattern=), so pydantic-core matches it natively
+# in Rust, which is faster than a Python-level validator calling re.match.
+# Match it with re.fullmatch in Python: there $ also matches before "\n".
+_ASSUMPTION_ID_PATTERN = r"^(?:A\d+|[\w-]+:A\d+)$"
+
 
 class Assumption(BaseModel):
     """
@@ -40,12 +76,14 @@ class Assumption(BaseModel):
     Tracks what is being taken for granted in reasoning
     """
 
-    model_config = {"strict": True}
+    # All models hide inputs in errors: rejected payloads (e.g. large JSON
+    # lists) are never rendered into messages, and the CLI only reports loc/msg
+    model_config = {"strict": True, "frozen": True, "hide_input_in_errors": True}
 
     id: Annotated[
         str,
         Field(
-            pattern=r"^(A\d+|[\w-]+:A\d+)$",
+            pattern=_ASSUMPTION_ID_PATTERN,
             description=(
                 "Unique identifier for this assumption "
                 "(e.g., 'A1', 'A2' for local, 'session-id:A1' for cross-session)"
@@ -90,6 +128,11 @@ class Assumption(BaseModel):
         Field(None, description="Whether this assumption has been verified"),
     ] = None
 
+    @field_validator("id")
+    @classmethod
+    def intern_id(cls, v: str) -> str:
+        return sys.intern(v)
+
     @property
     def is_verified(self) -> bool:
         """Check if this assumption has been verified (true or false)"""
@@ -110,6 +153,39 @@ class Assumption(BaseModel):
         )
 
 
+def _intern_ids(values: list[str] | None) -> list[str] | None:
+    """Intern ID strings so repeated references share one object"""
+    if values is None:
+        return None
+    return [sys.intern(v) for v in values]
+
+
+def _split_scoped_ids(
+    ids: list[str] | None,
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Split assumption IDs into (local, cross-session) groups, keeping order"""
+    if not ids:
+        return (), ()
+    local: list[str] = []
+    cross_session: list[str] = []
+    for i in ids:
+        (cross_session if ":" in i else local).append(i)
+    return tuple(local), tuple(cross_session)
+
+
+# Longest list of valid choices quoted in a "not found" error message
+_MAX_AVAILABLE_LISTED = 20
+
+
+def _format_available[T: (int, str)](values: AbstractSet[T]) -> str:
+    """Render the smallest values for an error message, counting the rest"""
+    # Partial selection, so huge sessions don't pay for a full sort
+    listed = heapq.nsmallest(_MAX_AVAILABLE_LISTED, values)
+    if len(values) > len(listed):
+        return f"{listed} and {len(values) - len(listed)} more"
+    return str(listed)
+
+
 def _validate_thought_not_empty(value: str) -> str:
     """Helper function to validate thought is non-empty"""
     if not value or not value.strip():
@@ -159,6 +235,8 @@ def _fix_shell_escaped_quotes(value: str) -> str | None:
 class _ParseResult:
     """Result of parsing attempt: success with list, parsed but not list, or failed."""
 
+    __slots__ = ("parsed_type", "value")
+
     def __init__(
         self,
         value: list[Any] | None = None,
@@ -181,16 +259,19 @@ def _try_parse_as_list(value: str) -> _ParseResult:
 
     Returns a _ParseResult indicating success, parsed-but-not-list, or failure.
     """
-    # Try standard JSON first
+    # Try standard JSON first (orjson.JSONDecodeError subclasses the stdlib one)
     try:
-        parsed = json.loads(value)
+        parsed = _json_loads(value)
         if isinstance(parsed, list):
             return _ParseResult(value=parsed)
         return _ParseResult(parsed_type=type(parsed).__name__)
     except json.JSONDecodeError:
         pass
 
-    # Fallback: try Python literal syntax (handles single quotes)
+    # Fallback: try Python literal syntax (handles single quotes). ast is
+    # imported here since it is costly to load and only this rare path uses it
+    import ast
+
     try:
         parsed = ast.literal_eval(value)
         if isinstance(parsed, list):
@@ -220,6 +301,14 @@ def _parse_json_list(value: Any, field_name: str) -> Any:
             f"{field_name} must be a list or JSON string, got {type(value).__name__}"
         )
 
+    # Only "[" can start a list literal, so fail fast before invoking a parser
+    first_char = value.lstrip()[:1]
+    if first_char != "[":
+        raise ValueError(
+            f"{field_name} must be a list or valid JSON string "
+            f"representing a list. Input starts with {first_char!r}, expected '['"
+        )
+
     # Try parsing the value directly
     result = _try_parse_as_list(value)
     if result.is_list:
@@ -244,35 +333,78 @@ def _parse_json_list(value: Any, field_name: str) -> Any:
     )
 
 
-class Thought(BaseModel):
-    """Model: Represents a single thought in sequential thinking process"""
+_ASSUMPTION_LIST_ADAPTER: TypeAdapter[list[Assumption]] = TypeAdapter(list[Assumption])
+_ASSUMPTION_MAP_ADAPTER: TypeAdapter[dict[str, Assumption]] = TypeAdapter(
+    dict[str, Assumption]
+)
+_STR_LIST_ADAPTER: TypeAdapter[list[str]] = TypeAdapter(list[str])
+# List fields accepted as JSON strings from the CLI, with their item adapters
+_LIST_FIELD_ADAPTERS: dict[str, TypeAdapter[list[Any]]] = {
+    "assumptions": _ASSUMPTION_LIST_ADAPTER,
+    "depends_on_assumptions": _STR_LIST_ADAPTER,
+    "invalidates_assumptions": _STR_LIST_ADAPTER,
+}
+
+
+def _parse_validated_list[T](
+    value: Any, field_name: str, adapter: TypeAdapter[list[T]]
+) -> Any:
+    """Parse list input, validating JSON arrays in a single pass.
+
+    Well-formed JSON arrays are parsed and validated by the cached adapter
+    without materializing intermediate Python objects. Anything else (Python
+    literals, shell-mangled quoting, invalid items) falls back to
+    _parse_json_list so error reporting stays unchanged.
+    """
+    if isinstance(value, str) and value.lstrip().startswith("["):
+        try:
+            return adapter.validate_json(value)
+        except ValidationError:
+            pass
+    return _parse_json_list(value, field_name)
+
 
-    model_config = {"strict": True}
+# Largest thought number or count accepted. Session files must round-trip it,
+# and orjson encodes at most 64-bit integers (it decodes wider ones as floats)
+_MAX_THOUGHT_NUMBER = 2**63 - 1
+
+
+class _ThoughtBase(BaseModel):
+    """Model: Fields and validation shared by Thought and ThoughtRequest"""
+
+    model_config = {"strict": True, "frozen": True, "hide_input_in_errors": True}
 
     thought: Annotated[
         str, Field(min_length=1, description="Your current thinking step")
     ]
-    thought_number: Annotated[
+    total_thoughts: Annotated[
         int,
         Field(
-            ge=1, description="Current thought number (numeric value, e.g., 1, 2, 3)"
+            ge=1,
+            le=_MAX_THOUGHT_NUMBER,
+            description="Estimated total thoughts needed (numeric value)",
         ),
     ]
-    total_thoughts: Annotated[
-        int,
-        Field(ge=1, description="Estimated total thoughts needed (numeric value)"),
-    ]
-    next_thought_needed: Annotated[
-        bool, Field(description="Whether another thought step is needed")
-    ]
     is_revision: Annotated[
         bool | None, Field(None, description="Whether this revises previous thinking")
     ] = None
     revises_thought: Annotated[
-        int | None, Field(None, ge=1, description="Which thought is being reconsidered")
+        int | None,
+        Field(
+            None,
+            ge=1,
+            le=_MAX_THOUGHT_NUMBER,
+            description="Which thought is being reconsidered",
+        ),
     ] = None
     branch_from_thought: Annotated[
-        int | None, Field(None, ge=1, description="Branching point thought number")
+        int | None,
+        Field(
+            None,
+            ge=1,
+            le=_MAX_THOUGHT_NUMBER,
+            description="Branching point thought number",
+        ),
     ] = None
     branch_id: Annotated[str | None, Field(None, description="Branch identifier")] = (
         None
@@ -307,20 +439,52 @@ class Thought(BaseModel):
     def validate_thought_not_empty(cls, v: str) -> str:
         return _validate_thought_not_empty(v)
 
-    @field_validator("assumptions", mode="before")
+    @field_validator(*_LIST_FIELD_ADAPTERS, mode="before")
     @classmethod
-    def validate_assumptions(cls, v: Any) -> Any:
-        return _parse_json_list(v, "assumptions")
+    def validate_list_fields(cls, v: Any, info: ValidationInfo) -> Any:
+        # field_name is always set for field validators; it is only typed Optional
+        field_name = cast("str", info.field_name)
+        return _parse_validated_list(v, field_name, _LIST_FIELD_ADAPTERS[field_name])
 
-    @field_validator("depends_on_assumptions", mode="before")
+    @field_validator("depends_on_assumptions", "invalidates_assumptions")
     @classmethod
-    def validate_depends_on_assumptions(cls, v: Any) -> Any:
-        return _parse_json_list(v, "depends_on_assumptions")
+    def intern_assumption_refs(cls, v: list[str] | None) -> list[str] | None:
+        return _intern_ids(v)
 
-    @field_validator("invalidates_assumptions", mode="before")
+    @field_validator("branch_id")
     @classmethod
-    def validate_invalidates_assumptions(cls, v: Any) -> Any:
-        return _parse_json_list(v, "invalidates_assumptions")
+    def intern_branch_id(cls, v: str | None) -> str | None:
+        return None if v is None else sys.intern(v)
+
+
+class Thought(_ThoughtBase):
+    """Model: Represents a single thought in sequential thinking process"""
+
+    thought_number: Annotated[
+        int,
+        Field(
+            ge=1,
+            le=_MAX_THOUGHT_NUMBER,
+            description="Current thought number (numeric value, e.g., 1, 2, 3)",
+        ),
+    ]
+    next_thought_needed: Annotated[
+        bool, Field(description="Whether another thought step is needed")
+    ]
+
+    # Reference lists pre-split once into (local, cross-session) groups
+    _local_dependencies: tuple[str, ...] = PrivateAttr(default=())
+    _cross_session_dependencies: tuple[str, ...] = PrivateAttr(default=())
+    _local_invalidations: tuple[str, ...] = PrivateAttr(default=())
+    _cross_session_invalidations: tuple[str, ...] = PrivateAttr(default=())
+
+    def model_post_init(self, _context: Any, /) -> None:
+        self._local_dependencies, self._cross_session_dependencies = _split_scoped_ids(
+            self.depends_on_assumptions
+        )
+        self._local_invalidations, self._cross_session_invalidations = (
+            _split_scoped_ids(self.invalidates_assumptions)
+        )
 
     @property
     def is_branch(self) -> bool:
@@ -330,10 +494,20 @@ class Thought(BaseModel):
     def is_final(self) -> bool:
         return not self.next_thought_needed
 
-    def auto_adjust_total(self) -> None:
-        self.total_thoughts = max(self.thought_number, self.total_thoughts)
+    def auto_adjust_total(self) -> Thought:
+        """Return this thought with total_thoughts raised to thought_number"""
+        if self.thought_number <= self.total_thoughts:
+            return self
+        return self.model_copy(update={"total_thoughts": self.thought_number})
 
-    def validate_references(self, existing_thought_numbers: set[int]) -> None:
+    def validate_references(self, existing_thought_numbers: AbstractSet[int]) -> None:
+        """Check revision and branch targets against existing thought numbers.
+
+        Takes the session's own incrementally maintained set, which it only
+        reads, so each call costs O(1) per reference rather than O(history).
+        """
+        if self.revises_thought is None and self.branch_from_thought is None:
+            return
         if (
             self.is_revision
             and self.revises_thought is not None
@@ -345,7 +519,7 @@ class Thought(BaseModel):
                     "no thoughts exist in this session yet. "
                     "To continue an existing session, pass the session_id parameter."
                 )
-            available = sorted(existing_thought_numbers)
+            available = _format_available(existing_thought_numbers)
             raise ValueError(
                 f"Cannot revise thought {self.revises_thought}: "
                 f"thought not found in this session. Available thoughts: {available}"
@@ -362,95 +536,41 @@ class Thought(BaseModel):
                     "no thoughts exist in this session yet. "
                     "To continue an existing session, pass the session_id parameter."
                 )
-            available = sorted(existing_thought_numbers)
+            available = _format_available(existing_thought_numbers)
             raise ValueError(
                 f"Cannot branch from thought {self.branch_from_thought}: "
                 f"thought not found in this session. Available thoughts: {available}"
             )
 
 
-class ThoughtRequest(BaseModel):
+class ThoughtRequest(_ThoughtBase):
     """Model: Request model for ultrathink tool"""
 
-    model_config = {"strict": True}
-
-    thought: Annotated[
-        str, Field(min_length=1, description="Your current thinking step")
-    ]
-    total_thoughts: Annotated[
-        int, Field(ge=1, description="Estimated total thoughts needed")
-    ]
     next_thought_needed: Annotated[
         bool | None, Field(None, description="Whether another thought step is needed")
     ] = None
     thought_number: Annotated[
-        int | None, Field(None, ge=1, description="Current thought number")
+        int | None,
+        Field(None, ge=1, le=_MAX_THOUGHT_NUMBER, description="Current thought number"),
     ] = None
     session_id: Annotated[str | None, Field(None, description="Session identifier")] = (
         None
     )
-    is_revision: Annotated[
-        bool | None, Field(None, description="Whether this revises previous thinking")
-    ] = None
-    revises_thought: Annotated[
-        int | None, Field(None, ge=1, description="Which thought is being reconsidered")
-    ] = None
-    branch_from_thought: Annotated[
-        int | None, Field(None, ge=1, description="Branching point thought number")
-    ] = None
-    branch_id: Annotated[str | None, Field(None, description="Branch identifier")] = (
-        None
-    )
-    needs_more_thoughts: Annotated[
-        bool | None, Field(None, description="If more thoughts are needed")
-    ] = None
-    confidence: Annotated[
-        float | None,
-        Field(None, ge=0.0, le=1.0, description="Confidence level (0.0-1.0)"),
-    ] = None
-    uncertainty_notes: Annotated[
-        str | None, Field(None, description="Explanation for uncertainty")
-    ] = None
-    outcome: Annotated[
-        str | None, Field(None, description="What was achieved or expected")
-    ] = None
-    assumptions: Annotated[
-        list[Assumption] | None,
-        Field(None, description="Assumptions made in this thought"),
-    ] = None
-    depends_on_assumptions: Annotated[
-        list[str] | None,
-        Field(None, description="Assumption IDs this thought depends on"),
-    ] = None
-    invalidates_assumptions: Annotated[
-        list[str] | None, Field(None, description="Assumption IDs proven false")
-    ] = None
 
-    @field_validator("thought")
+    @field_validator("session_id")
     @classmethod
-    def validate_thought_not_empty(cls, v: str) -> str:
-        return _validate_thought_not_empty(v)
-
-    @field_validator("assumptions", mode="before")
-    @classmethod
-    def validate_assumptions(cls, v: Any) -> Any:
-        return _parse_json_list(v, "assumptions")
-
-    @field_validator("depends_on_assumptions", mode="before")
-    @classmethod
-    def validate_depends_on_assumptions(cls, v: Any) -> Any:
-        return _parse_json_list(v, "depends_on_assumptions")
-
-    @field_validator("invalidates_assumptions", mode="before")
-    @classmethod
-    def validate_invalidates_assumptions(cls, v: Any) -> Any:
-        return _parse_json_list(v, "invalidates_assumptions")
+    def validate_session_id(cls, v: str | None) -> str | None:
+        # Reject unsafe IDs with the other input errors, before any session
+        # lookup; storage functions still check IDs they are called with
+        if v is not None:
+            _validate_session_id(v)
+        return v
 
 
 class ThoughtResponse(BaseModel):
     """Model: Response model for ultrathink tool"""
 
-    model_config = {"strict": True}
+    model_config = {"strict": True, "frozen": True, "hide_input_in_errors": True}
 
     session_id: Annotated[str, Field(description="Session identifier for continuation")]
     thought_number: Annotated[
@@ -499,23 +619,64 @@ class ThoughtResponse(BaseModel):
 # =============================================================================
 
 
+# Session error templates, kept together so the messages stay greppable
+_ERR_ASSUMPTION_NOT_FOUND = (
+    "Cannot {action} assumption {assumption_id}: "
+    "assumption not found. Available: {available}"
+)
+_ERR_ASSUMPTION_TEXT_MISMATCH = (
+    "Cannot update assumption {assumption_id}: text mismatch. "
+    "Existing: '{existing}', New: '{new}'. "
+    "Core assumption fields (text, critical) are immutable."
+)
+_ERR_ASSUMPTION_CRITICAL_MISMATCH = (
+    "Cannot update assumption {assumption_id}: "
+    "critical flag mismatch. Existing: {existing}, New: {new}. "
+    "Core fields (text, critical) are immutable."
+)
+
+
 def _parse_assumption_id(assumption_id: str) -> tuple[str | None, str]:
     """Parse scoped assumption ID into (session_id, local_id)"""
-    if ":" in assumption_id:
-        parts = assumption_id.split(":", 1)
-        return parts[0], parts[1]
+    # One pass over the string, unlike a membership test followed by split
+    session_id, sep, local_id = assumption_id.partition(":")
+    if sep:
+        return session_id, local_id
     return None, assumption_id
 
 
 class ThinkingSession:
     """Model: Manages the sequential thinking session"""
 
+    __slots__ = (
+        "_assumptions",
+        "_branches",
+        "_cross_session_warnings",
+        "_falsified",
+        "_risky",
+        "_saved",
+        "_thought_numbers",
+        "_thoughts",
+        "_unresolved_refs",
+        "_unsaved_assumptions",
+    )
+
     def __init__(self) -> None:
         self._thoughts: list[Thought] = []
+        # Kept in step with _thoughts so reference checks never rescan history
+        self._thought_numbers: set[int] = set()
         self._branches: dict[str, list[Thought]] = {}
         self._assumptions: dict[str, Assumption] = {}
-        self._unresolved_refs: list[str] = []
+        # IDs currently risky/falsified, updated whenever an assumption is stored
+        self._risky: set[str] = set()
+        self._falsified: set[str] = set()
+        # Insertion-ordered set: O(1) dedup while keeping first-seen order
+        self._unresolved_refs: dict[str, None] = {}
         self._cross_session_warnings: list[str] = []
+        # What save_session last persisted, and where; None if never saved
+        self._saved: _SaveState | None = None
+        # IDs stored since that save, in first-stored order
+        self._unsaved_assumptions: dict[str, None] = {}
 
     @property
     def thought_count(self) -> int:
@@ -529,114 +690,189 @@ class ThinkingSession:
     def all_assumptions(self) -> dict[str, Assumption]:
         return self._assumptions.copy()
 
+    @property
+    def assumption_ids(self) -> frozenset[str]:
+        return frozenset(self._assumptions)
+
     @property
     def risky_assumptions(self) -> list[str]:
-        return [aid for aid, a in self._assumptions.items() if a.is_risky]
+        return self._in_assumption_order(self._risky)
 
     @property
     def falsified_assumptions(self) -> list[str]:
-        return [aid for aid, a in self._assumptions.items() if a.is_falsified]
+        return self._in_assumption_order(self._falsified)
 
     @property
     def unresolved_references(self) -> list[str]:
-        return self._unresolved_refs.copy()
+        return list(self._unresolved_refs)
 
     @property
     def cross_session_warnings(self) -> list[str]:
         return self._cross_session_warnings.copy()
 
-    def add_thought(  # noqa: PLR0912
-        self, thought: Thought, validated_cross_session_refs: list[str] | None = None
-    ) -> None:
-        thought.auto_adjust_total()
-        existing_numbers = {t.thought_number for t in self._thoughts}
-        thought.validate_references(existing_numbers)
-
-        if thought.depends_on_assumptions:
-            for assumption_id in thought.depends_on_assumptions:
-                session_id, _ = _parse_assumption_id(assumption_id)
-                if session_id is None:
-                    if assumption_id not in self._assumptions:
-                        available = sorted(self._assumptions.keys())
-                        avail_str = str(available) if available else "none"
-                        raise ValueError(
-                            f"Cannot depend on assumption {assumption_id}: "
-                            f"assumption not found. Available: {avail_str}"
-                        )
-                elif (
-                    validated_cross_session_refs
-                    and assumption_id in validated_cross_session_refs
-                ):
-                    continue
-                elif assumption_id not in self._unresolved_refs:
-                    self._unresolved_refs.append(assumption_id)
-
-        if thought.assumptions:
-            for assumption in thought.assumptions:
-                if assumption.id in self._assumptions:
-                    existing = self._assumptions[assumption.id]
-                    if existing.text != assumption.text:
-                        raise ValueError(
-                            f"Cannot update assumption {assumption.id}: text mismatch. "
-                            f"Existing: '{existing.text}', New: '{assumption.text}'. "
-                            f"Core assumption fields (text, critical) are immutable."
-                        )
-                    if existing.critical != assumption.critical:
-                        raise ValueError(
-                            f"Cannot update assumption {assumption.id}: "
-                            f"critical flag mismatch. Existing: {existing.critical}, "
-                            f"New: {assumption.critical}. "
-                            "Core fields (text, critical) are immutable."
-                        )
-                    existing.confidence = assumption.confidence
-                    existing.verifiable = assumption.verifiable
-                    existing.evidence = assumption.evidence
-                    existing.verification_status = assumption.verification_status
-                else:
-                    self._assumptions[assumption.id] = assumption
-
-        if thought.invalidates_assumptions:
-            for assumption_id in thought.invalidates_assumptions:
-                session_id, _ = _parse_assumption_id(assumption_id)
-                if session_id is None:
-                    if assumption_id not in self._assumptions:
-                        available = sorted(self._assumptions.keys())
-                        avail_str = str(available) if available else "none"
-                        raise ValueError(
-                            f"Cannot invalidate assumption {assumption_id}: "
-                            f"assumption not found. Available: {avail_str}"
-                        )
-                    self._assumptions[
-                        assumption_id
-                    ].verification_status = "verified_false"
-                else:
-                    warning = (
-                        f"Cannot invalidate cross-session assumption "
-                        f"{assumption_id}: cross-session invalidation not supported"
-                    )
-                    self._cross_session_warnings.append(warning)
+    @property
+    def has_unsaved_changes(self) -> bool:
+        if self._saved is None:
+            return bool(self._thoughts)
+        return not self._saved.covers(self)
+
+    def _in_assumption_order(self, assumption_ids: set[str]) -> list[str]:
+        """List assumption_ids in the order their assumptions were first added"""
+        if not assumption_ids:
+            return []
+        return [aid for aid in self._assumptions if aid in assumption_ids]
+
+    def _index_assumption(self, assumption_id: str, assumption: Assumption) -> None:
+        if assumption.is_risky:
+            self._risky.add(assumption_id)
+        else:
+            self._risky.discard(assumption_id)
+        if assumption.is_falsified:
+            self._falsified.add(assumption_id)
+        else:
+            self._falsified.discard(assumption_id)
 
-        self._thoughts.append(thought)
+    def _store_assumption(self, assumption_id: str, assumption: Assumption) -> None:
+        self._assumptions[assumption_id] = assumption
+        self._index_assumption(assumption_id, assumption)
+        self._unsaved_assumptions[assumption_id] = None
 
+    def _append_thought(self, thought: Thought) -> None:
+        self._thoughts.append(thought)
+        self._thought_numbers.add(thought.thought_number)
         if thought.is_branch and thought.branch_id is not None:
             if thought.branch_id not in self._branches:
                 self._branches[thought.branch_id] = []
             self._branches[thought.branch_id].append(thought)
 
+    def _require_local_assumptions(
+        self,
+        assumption_ids: tuple[str, ...],
+        action: str,
+        pending: AbstractSet[str] = frozenset(),
+    ) -> None:
+        """Raise for the first of assumption_ids not defined in this session
+
+        IDs in pending, defined by the thought being added, count as defined.
+        """
+        # One C-level subset check on the common all-present path
+        if self._assumptions.keys() >= set(assumption_ids):
+            return
+        missing = next(
+            (
+                aid
+                for aid in assumption_ids
+                if aid not in self._assumptions and aid not in pending
+            ),
+            None,
+        )
+        if missing is None:
+            return
+        raise ValueError(
+            _ERR_ASSUMPTION_NOT_FOUND.format(
+                action=action,
+                assumption_id=missing,
+                available=_format_available(self._assumptions.keys())
+                if self._assumptions
+                else "none",
+            )
+        )
+
+    def add_thought(
+        self, thought: Thought, validated_cross_session_refs: set[str] | None = None
+    ) -> None:
+        thought = thought.auto_adjust_total()
+        thought.validate_references(self._thought_numbers)
+
+        # Every check runs before the first mutation, so a rejected thought
+        # leaves the session exactly as it was
+        self._require_local_assumptions(thought._local_dependencies, "depend on")
+
+        incoming: dict[str, Assumption] = {}
+        for assumption in thought.assumptions or ():
+            existing = incoming.get(assumption.id) or self._assumptions.get(
+                assumption.id
+            )
+            if existing is not None:
+                if existing.text != assumption.text:
+                    raise ValueError(
+                        _ERR_ASSUMPTION_TEXT_MISMATCH.format(
+                            assumption_id=assumption.id,
+                            existing=existing.text,
+                            new=assumption.text,
+                        )
+                    )
+                if existing.critical != assumption.critical:
+                    raise ValueError(
+                        _ERR_ASSUMPTION_CRITICAL_MISMATCH.format(
+                            assumption_id=assumption.id,
+                            existing=existing.critical,
+                            new=assumption.critical,
+                        )
+                    )
+            incoming[assumption.id] = assumption
+
+        self._require_local_assumptions(
+            thought._local_invalidations, "invalidate", incoming.keys()
+        )
+
+        for assumption_id in thought._cross_session_dependencies:
+            if (
+                validated_cross_session_refs is None
+                or assumption_id not in validated_cross_session_refs
+            ):
+                self._unresolved_refs[assumption_id] = None
+
+        # Core fields are immutable, so for existing IDs the incoming
+        # assumption already carries the merged state.
+        for assumption_id, assumption in incoming.items():
+            self._store_assumption(assumption_id, assumption)
+        for assumption_id in thought._local_invalidations:
+            self._store_assumption(
+                assumption_id,
+                self._assumptions[assumption_id].model_copy(
+                    update={"verification_status": "verified_false"}
+                ),
+            )
+        for assumption_id in thought._cross_session_invalidations:
+            warning = (
+                f"Cannot invalidate cross-session assumption "
+                f"{assumption_id}: cross-session invalidation not supported"
+            )
+            self._cross_session_warnings.append(warning)
+
+        self._append_thought(thought)
+
 
 # =============================================================================
 # Session Storage
 # =============================================================================
 
 
+_SESSIONS_DIR_ENV = "ULTRATHINK_SESSIONS_DIR"
+
+
 def _get_sessions_dir() -> Path:
     """Get the sessions directory path, create if not exists"""
-    sessions_dir = Path(tempfile.gettempdir()) / "ultrathink" / "sessions"
+    return _resolve_sessions_dir(os.environ.get(_SESSIONS_DIR_ENV) or None)
+
+
+@functools.cache
+def _resolve_sessions_dir(override: str | None) -> Path:
+    # Resolved and created once per override value; _write_atomic recreates
+    # the directory if something (e.g. a temp cleaner) removes it later
+    if override:
+        sessions_dir = Path(override)
+    else:
+        import tempfile  # Deferred: not needed when the override is set
+
+        sessions_dir = Path(tempfile.gettempdir()) / "ultrathink" / "sessions"
     sessions_dir.mkdir(parents=True, exist_ok=True)
     return sessions_dir
 
 
-_SESSION_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]+$")
+# Plain set membership: no regex VM, and no "$"-before-trailing-newline quirk
+_SESSION_ID_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
 
 
 def _validate_session_id(session_id: str) -> None:
@@ -645,7 +881,7 @@ def _validate_session_id(session_id: str) -> None:
         raise ValueError("Session ID cannot be empty")
     if len(session_id) > 128:
         raise ValueError("Session ID too long (max 128 characters)")
-    if not _SESSION_ID_PATTERN.match(session_id):
+    if not _SESSION_ID_CHARS.issuperset(session_id):
         raise ValueError(
             f"Invalid session ID '{session_id}': must contain only "
             "alphanumeric characters, hyphens, and underscores"
@@ -657,75 +893,351 @@ def _session_file_path(session_id: str) -> Path:
     return _get_sessions_dir() / f"{session_id}.json"
 
 
-def save_session(session_id: str, session: ThinkingSession) -> None:
+# Siblings of a session's <session_id>.json, derived from its already
+# validated path with Path.with_suffix (session IDs contain no dots)
+_LOG_SUFFIX = ".jsonl"
+_KEYS_SUFFIX = ".keys"
+
+
+def _session_keys_path(session_id: str) -> Path:
+    return _session_file_path(session_id).with_suffix(_KEYS_SUFFIX)
+
+
+# (mtime_ns, size) of a session's .json file followed by those of its log
+type _Fingerprint = tuple[int, int, int, int]
+
+
+def _session_fingerprint(session_id: str) -> _Fingerprint | None:
+    """Return (mtime_ns, size) of the session file, then of its log.
+
+    The log pair is (0, 0) while there is no log; None if there is no file.
+    """
+    file_path = _session_file_path(session_id)
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return None
+    try:
+        log_stat = file_path.with_suffix(_LOG_SUFFIX).stat()
+    except OSError:
+        return stat.st_mtime_ns, stat.st_size, 0, 0
+    return stat.st_mtime_ns, stat.st_size, log_stat.st_mtime_ns, log_stat.st_size
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when available.
+
+    Session files are only read back by this script, so they skip the
+    indentation the CLI output uses for humans.
+    """
+    if _HAS_ORJSON:
+        payload: bytes = orjson.dumps(obj)
+        return payload
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _json_loads(data: bytes | str) -> Any:
+    """Parse JSON text or UTF-8 bytes, using orjson when available"""
+    if _HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write data to a sibling temp file, then rename it over path"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        try:
+            tmp_path.write_bytes(data)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+# Log records appended before save_session rewrites the full snapshot
+_LOG_COMPACT_EVERY = 64
+
+
+class _SaveState:
+    """How much of a session is on disk under session_id, and in which log"""
+
+    __slots__ = (
+        "assumptions",
+        "log_records",
+        "session_id",
+        "thoughts",
+        "token",
+        "unresolved",
+        "warnings",
+    )
+
+    def __init__(
+        self, session_id: str, token: str, session: ThinkingSession, log_records: int
+    ) -> None:
+        self.session_id = session_id
+        self.token = token
+        self.log_records = log_records
+        self.assumptions = len(session._assumptions)
+        self.thoughts = len(session._thoughts)
+        self.unresolved = len(session._unresolved_refs)
+        self.warnings = len(session._cross_session_warnings)
+
+    def covers(self, session: ThinkingSession) -> bool:
+        return (
+            not session._unsaved_assumptions
+            and self.thoughts == len(session._thoughts)
+            and self.unresolved == len(session._unresolved_refs)
+            and self.warnings == len(session._cross_session_warnings)
+        )
+
+
+def _thought_record(t: Thought) -> dict[str, Any]:
+    """Return the same dict as t.model_dump(), without the serializer pass.
+
+    A model's __dict__ holds exactly its field values, so copying it follows
+    new fields automatically; only the nested assumptions need dumping.
+    """
+    record = t.__dict__.copy()
+    if t.assumptions:
+        record["assumptions"] = [a.model_dump() for a in t.assumptions]
+    return record
+
+
+def _write_session_keys(
+    file_path: Path, session: ThinkingSession, log_size: int
+) -> None:
+    # Sidecar of newline-separated assumption IDs for cheap cross-session
+    # checks. Its first line stamps the snapshot it belongs to and the log
+    # size from which it is complete, so readers can tell when it is not
+    snapshot = file_path.stat()
+    stamp = f"{snapshot.st_mtime_ns} {snapshot.st_size} {log_size}"
+    _write_atomic(
+        file_path.with_suffix(_KEYS_SUFFIX),
+        "\n".join((stamp, *session._assumptions)).encode(),
+    )
+
+
+def _write_snapshot(file_path: Path, session_id: str, session: ThinkingSession) -> None:
+    # Ties the log to this snapshot, so a log left by an older one is ignored
+    token = os.urandom(8).hex()
     data = {
-        "thoughts": [
-            {
-                "thought": t.thought,
-                "thought_number": t.thought_number,
-                "total_thoughts": t.total_thoughts,
-                "next_thought_needed": t.next_thought_needed,
-                "is_revision": t.is_revision,
-                "revises_thought": t.revises_thought,
-                "branch_from_thought": t.branch_from_thought,
-                "branch_id": t.branch_id,
-                "needs_more_thoughts": t.needs_more_thoughts,
-                "confidence": t.confidence,
-                "uncertainty_notes": t.uncertainty_notes,
-                "outcome": t.outcome,
-                "assumptions": [a.model_dump() for a in t.assumptions]
-                if t.assumptions
-                else None,
-                "depends_on_assumptions": t.depends_on_assumptions,
-                "invalidates_assumptions": t.invalidates_assumptions,
-            }
-            for t in session._thoughts
-        ],
+        "log_token": token,
+        "thoughts": [_thought_record(t) for t in session._thoughts],
         "assumptions": {aid: a.model_dump() for aid, a in session._assumptions.items()},
         "branches": {
             bid: [t.thought_number for t in thoughts]
             for bid, thoughts in session._branches.items()
         },
-        "unresolved_refs": session._unresolved_refs,
+        "unresolved_refs": list(session._unresolved_refs),
         "cross_session_warnings": session._cross_session_warnings,
     }
-    with _session_file_path(session_id).open("w") as f:
-        json.dump(data, f, indent=2)
+    # Readers never see a partially written file, only the old or new one
+    _write_atomic(file_path, _json_dumps(data))
+    file_path.with_suffix(_LOG_SUFFIX).unlink(missing_ok=True)
+    # After the snapshot, so a sidecar stamped for it never lags behind it
+    _write_session_keys(file_path, session, log_size=0)
+    session._saved = _SaveState(session_id, token, session, log_records=0)
+    session._unsaved_assumptions.clear()
+
 
+def _append_log_record(
+    file_path: Path, session: ThinkingSession, saved: _SaveState
+) -> None:
+    record = {
+        "thoughts": [_thought_record(t) for t in session._thoughts[saved.thoughts :]],
+        "assumptions": {
+            aid: session._assumptions[aid].model_dump()
+            for aid in session._unsaved_assumptions
+        },
+        "unresolved_refs": list(session._unresolved_refs)[saved.unresolved :],
+        "cross_session_warnings": session._cross_session_warnings[saved.warnings :],
+    }
+    line = _json_dumps(record) + b"\n"
+    log_path = file_path.with_suffix(_LOG_SUFFIX)
+    # New IDs reach the sidecar before the log, stamped with the log size
+    # once this record is in: until then readers see it as incomplete
+    new_ids = len(session._assumptions) > saved.assumptions
+    if saved.log_records == 0:
+        # First record since the snapshot: start a fresh log headed by its token
+        data = _json_dumps({"log_token": saved.token}) + b"\n" + line
+        if new_ids:
+            _write_session_keys(file_path, session, len(data))
+        _write_atomic(log_path, data)
+    else:
+        with log_path.open("ab") as f:
+            if new_ids:
+                _write_session_keys(file_path, session, f.tell() + len(line))
+            f.write(line)
+    session._saved = _SaveState(
+        saved.session_id, saved.token, session, saved.log_records + 1
+    )
+    session._unsaved_assumptions.clear()
+
+
+def save_session(session_id: str, session: ThinkingSession) -> None:
+    """Persist a session as a JSON snapshot plus an append-only JSONL log.
 
-def load_session(session_id: str) -> ThinkingSession | None:
+    Saving again to the same session ID appends only what changed since the
+    previous save as one line of <session_id>.jsonl, so a thought costs its
+    own size rather than a rewrite of the whole history. Saving to a new ID,
+    or every _LOG_COMPACT_EVERY appends, rewrites <session_id>.json in full
+    and drops the log.
+    """
     file_path = _session_file_path(session_id)
-    if not file_path.exists():
+    saved = session._saved
+    if saved is not None and saved.session_id == session_id and file_path.exists():
+        if saved.covers(session):
+            # Unchanged since it was last saved to or loaded from this file
+            return
+        if saved.log_records < _LOG_COMPACT_EVERY:
+            _append_log_record(file_path, session, saved)
+            return
+    _write_snapshot(file_path, session_id, session)
+
+
+def _load_session_keys(
+    session_id: str, fingerprint: _Fingerprint | None
+) -> frozenset[str] | None:
+    """Read a session's assumption IDs from its sidecar.
+
+    Returns None if the sidecar is unavailable or does not match the session
+    files with this fingerprint: written for another snapshot, ahead of a log
+    record not yet (or never) written, or older than the stamp itself.
+    """
+    if fingerprint is None:
+        return None
+    try:
+        text = _session_keys_path(session_id).read_bytes().decode()
+    except (OSError, UnicodeDecodeError):
         return None
+    stamp, _, assumption_ids = text.partition("\n")
+    try:
+        mtime_ns, size, log_size = map(int, stamp.split(" "))
+    except ValueError:
+        return None
+    if (mtime_ns, size) != fingerprint[:2] or fingerprint[3] < log_size:
+        return None
+    return frozenset(aid for aid in assumption_ids.split("\n") if aid)
+
+
+def _build_assumptions(
+    data: list[dict[str, Any]], *, validate: bool
+) -> list[Assumption]:
+    if validate:
+        return _ASSUMPTION_LIST_ADAPTER.validate_python(data)
+    return [Assumption.model_construct(**a) for a in data]
+
+
+def _build_assumption_map(
+    data: dict[str, dict[str, Any]], *, validate: bool
+) -> dict[str, Assumption]:
+    if validate:
+        return _ASSUMPTION_MAP_ADAPTER.validate_python(data)
+    return {aid: Assumption.model_construct(**a) for aid, a in data.items()}
+
+
+def _build_thought(data: dict[str, Any], *, validate: bool) -> Thought:
+    if data.get("assumptions"):
+        data["assumptions"] = _build_assumptions(data["assumptions"], validate=validate)
+    if validate:
+        return Thought(**data)
+    return Thought.model_construct(**data)
+
+
+def _apply_log_record(
+    session: ThinkingSession, record: dict[str, Any], *, validate: bool
+) -> None:
+    # Build everything first so a bad record leaves the session untouched
+    thoughts = [_build_thought(t, validate=validate) for t in record["thoughts"]]
+    assumptions = _build_assumption_map(record["assumptions"], validate=validate)
+    unresolved_refs = dict.fromkeys(record["unresolved_refs"])
+    warnings = list(record["cross_session_warnings"])
+
+    for thought in thoughts:
+        session._append_thought(thought)
+    for assumption_id, assumption in assumptions.items():
+        session._store_assumption(assumption_id, assumption)
+    session._unresolved_refs.update(unresolved_refs)
+    session._cross_session_warnings.extend(warnings)
+
+
+def _replay_log(
+    file_path: Path, session: ThinkingSession, token: str | None, *, validate: bool
+) -> int | None:
+    """Apply the session's log on top of its snapshot.
+
+    Returns the number of records applied, 0 when no log belongs to the
+    snapshot, or None when the snapshot or log needs rewriting: it predates
+    the log, or the log ends in a torn or unreadable record.
+    """
+    if token is None:
+        return None
+    try:
+        lines = file_path.with_suffix(_LOG_SUFFIX).read_bytes().split(b"\n")
+    except FileNotFoundError:
+        return 0
+    except OSError:
+        return None
+    # Non-empty only if a write was cut short before its newline
+    torn = lines.pop()
+    try:
+        header = _json_loads(lines[0]) if lines else None
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("log_token") != token:
+        # Left over from an older snapshot; the next append replaces it
+        return 0
+    for line in lines[1:]:
+        try:
+            _apply_log_record(session, _json_loads(line), validate=validate)
+        except (ValueError, KeyError, TypeError, ValidationError, AttributeError):
+            return None
+    return None if torn else len(lines) - 1
+
+
+def load_session(session_id: str, *, validate: bool = False) -> ThinkingSession | None:
+    """Load a persisted session.
+
+    Session files are written by save_session from already-validated models,
+    so by default they are trusted and rebuilt without re-running validation.
+    Pass validate=True to fully re-validate the on-disk data.
+    """
+    file_path = _session_file_path(session_id)
 
     try:
-        with file_path.open() as f:
-            data = json.load(f)
-    except (json.JSONDecodeError, OSError):
-        # Corrupted or unreadable session file - treat as non-existent
+        data = _json_loads(file_path.read_bytes())
+    except (ValueError, OSError):
+        # Missing, corrupted or unreadable session file - treat as non-existent
         return None
 
     try:
         session = ThinkingSession()
 
-        for aid, assumption_data in data.get("assumptions", {}).items():
-            session._assumptions[aid] = Assumption(**assumption_data)
+        session._assumptions = _build_assumption_map(
+            data.get("assumptions", {}), validate=validate
+        )
+        for assumption_id, assumption in session._assumptions.items():
+            session._index_assumption(assumption_id, assumption)
 
         for thought_data in data.get("thoughts", []):
-            if thought_data.get("assumptions"):
-                thought_data["assumptions"] = [
-                    Assumption(**a) for a in thought_data["assumptions"]
-                ]
-            thought = Thought(**thought_data)
-            session._thoughts.append(thought)
-            if thought.is_branch and thought.branch_id:
-                if thought.branch_id not in session._branches:
-                    session._branches[thought.branch_id] = []
-                session._branches[thought.branch_id].append(thought)
-
-        session._unresolved_refs = data.get("unresolved_refs", [])
+            session._append_thought(_build_thought(thought_data, validate=validate))
+
+        session._unresolved_refs = dict.fromkeys(data.get("unresolved_refs", []))
         session._cross_session_warnings = data.get("cross_session_warnings", [])
 
+        token = data.get("log_token")
+        log_records = _replay_log(file_path, session, token, validate=validate)
+        # Replayed assumptions came from disk, so none of them are unsaved
+        session._unsaved_assumptions.clear()
+        # With no usable log position it stays unsaved, so the next save
+        # writes a clean snapshot
+        if log_records is not None:
+            session._saved = _SaveState(session_id, token, session, log_records)
+
         return session
     except (KeyError, TypeError, ValidationError, AttributeError):
         # Invalid session data structure - treat as non-existent
@@ -737,86 +1249,268 @@ def load_session(session_id: str) -> ThinkingSession | None:
 # =============================================================================
 
 
+_DEFAULT_MAX_CACHED_SESSIONS = 128
+
+_ERR_UNSAVED_CONFLICT = (
+    "Cannot save thoughts processed without auto_save for session(s) "
+    "{session_ids}: another writer changed their files meanwhile. "
+    "Call reset(session_id) to discard those thoughts and reload from disk."
+)
+
+
 class UltraThinkService:
     """Service: Orchestrates the sequential thinking process"""
 
-    def __init__(self) -> None:
-        self._sessions: dict[str, ThinkingSession] = {}
+    __slots__ = (
+        "_assumption_ids",
+        "_conflicts",
+        "_fingerprints",
+        "_max_cached_sessions",
+        "_sessions",
+    )
+
+    def __init__(self, max_cached_sessions: int = _DEFAULT_MAX_CACHED_SESSIONS) -> None:
+        if max_cached_sessions < 1:
+            raise ValueError("max_cached_sessions must be at least 1")
+        self._max_cached_sessions = max_cached_sessions
+        self._sessions: OrderedDict[str, ThinkingSession] = OrderedDict()
+        # On-disk fingerprint of each cached session when it was cached/saved
+        self._fingerprints: dict[str, _Fingerprint | None] = {}
+        # Assumption IDs of sessions referenced cross-session, with the
+        # target's fingerprint when read: an entry is reused only while that
+        # still matches, so writes by other processes are picked up. Dropped
+        # when this service changes the session, and LRU-bounded like
+        # _sessions so long-lived services do not grow
+        self._assumption_ids: OrderedDict[
+            str, tuple[_Fingerprint | None, frozenset[str]]
+        ] = OrderedDict()
+        # Sessions holding unsaved thoughts whose files another writer changed.
+        # Kept out of _sessions, so they never count against its limit, until
+        # flush() or their own next request reports them
+        self._conflicts: dict[str, ThinkingSession] = {}
+
+    def reset(self, session_id: str | None = None) -> None:
+        """Drop in-memory session state (persisted sessions are kept).
+
+        Drops only session_id's state when given, otherwise every session's,
+        discarding thoughts processed without auto_save that were not flushed.
+        """
+        if session_id is None:
+            self._sessions.clear()
+            self._fingerprints.clear()
+            self._assumption_ids.clear()
+            self._conflicts.clear()
+            return
+        self._sessions.pop(session_id, None)
+        self._fingerprints.pop(session_id, None)
+        self._assumption_ids.pop(session_id, None)
+        self._conflicts.pop(session_id, None)
+
+    def _set_aside(self, session_id: str) -> None:
+        self._conflicts[session_id] = self._sessions.pop(session_id)
+        del self._fingerprints[session_id]
+
+    def _save_or_set_aside(self, session_id: str, session: ThinkingSession) -> None:
+        """Save a cached session, unless another writer changed its files"""
+        if _session_fingerprint(session_id) != self._fingerprints[session_id]:
+            self._set_aside(session_id)
+        else:
+            self._save(session_id, session)
+
+    def _cached_session(self, session_id: str) -> ThinkingSession | None:
+        """Return the cached session unless its file changed since caching.
+
+        A stat is far cheaper than decoding the file, and catches sessions
+        written by another process so they are reloaded instead of clobbered.
+        A changed session still holding unsaved thoughts is set aside rather
+        than dropped, so neither version is lost.
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if _session_fingerprint(session_id) != self._fingerprints.get(session_id):
+            if session.has_unsaved_changes:
+                self._set_aside(session_id)
+            else:
+                del self._sessions[session_id]
+                del self._fingerprints[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _cache_session(self, session_id: str, session: ThinkingSession) -> None:
+        """Cache a session as most recently used, evicting the coldest first.
+
+        Evicted sessions holding thoughts processed without auto_save are
+        saved, so they are simply reloaded on next access, or set aside if
+        another writer changed their files meanwhile. A conflict is never
+        reported to the unrelated request that caused the eviction.
+        """
+        while len(self._sessions) >= self._max_cached_sessions:
+            evicted_id, evicted = next(iter(self._sessions.items()))
+            if evicted.has_unsaved_changes:
+                self._save_or_set_aside(evicted_id, evicted)
+            self._sessions.pop(evicted_id, None)
+            self._fingerprints.pop(evicted_id, None)
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        self._fingerprints[session_id] = _session_fingerprint(session_id)
+
+    def _save(self, session_id: str, session: ThinkingSession) -> None:
+        save_session(session_id, session)
+        self._fingerprints[session_id] = _session_fingerprint(session_id)
+
+    def flush(self, session_id: str | None = None) -> None:
+        """Save cached sessions holding thoughts processed without auto_save.
+
+        Flushes only session_id when given, otherwise every cached session.
+        Until then those thoughts live only in this process. Sessions whose
+        files another writer changed in the meantime are not overwritten:
+        once the rest are saved, flush raises naming them, and keeps their
+        thoughts until reset(session_id) discards them.
+        """
+        session_ids = list(self._sessions) if session_id is None else [session_id]
+        for sid in session_ids:
+            session = self._sessions.get(sid)
+            if session is not None and session.has_unsaved_changes:
+                self._save_or_set_aside(sid, session)
+        conflicts = [
+            sid for sid in self._conflicts if session_id is None or sid == session_id
+        ]
+        if conflicts:
+            raise ValueError(
+                _ERR_UNSAVED_CONFLICT.format(session_ids=", ".join(conflicts))
+            )
 
     def _get_or_create_session(
         self, session_id: str | None
     ) -> tuple[str, ThinkingSession]:
         if session_id is None:
+            import uuid  # Deferred: only needed to create a session
+
             new_id = str(uuid.uuid4())
             session = ThinkingSession()
-            self._sessions[new_id] = session
+            self._cache_session(new_id, session)
             return new_id, session
 
-        if session_id in self._sessions:
-            return session_id, self._sessions[session_id]
+        cached_session = self._cached_session(session_id)
+        if cached_session is not None:
+            return session_id, cached_session
+        if session_id in self._conflicts:
+            raise ValueError(_ERR_UNSAVED_CONFLICT.format(session_ids=session_id))
 
         loaded_session = load_session(session_id)
         if loaded_session is not None:
-            self._sessions[session_id] = loaded_session
+            self._cache_session(session_id, loaded_session)
             return session_id, loaded_session
 
         new_session = ThinkingSession()
-        self._sessions[session_id] = new_session
+        self._cache_session(session_id, new_session)
         return session_id, new_session
 
     def _resolve_cross_session_assumption(
-        self, scoped_id: str, _current_session_id: str
+        self, scoped_id: str, missing_sessions: set[str]
     ) -> tuple[str | None, bool]:
+        """Resolve a scoped ID against its target session's assumption IDs.
+
+        Target sessions found not to exist are added to missing_sessions, so
+        the caller can share it across one request's references and probe
+        each absent session on disk only once.
+        """
         target_session_id, local_id = _parse_assumption_id(scoped_id)
 
         if target_session_id is None:
             return scoped_id, True
+        if target_session_id in missing_sessions:
+            return None, False
 
-        if target_session_id not in self._sessions:
-            target_session = load_session(target_session_id)
+        # Taken before the IDs are read. The sidecar is only used while its
+        # stamp matches this fingerprint, and a fallback load reads files at
+        # least as new, so a racing save can at worst make the entry look
+        # stale on its next use
+        fingerprint = _session_fingerprint(target_session_id)
+        cached = self._assumption_ids.get(target_session_id)
+        assumption_ids: frozenset[str] | None
+        if cached is not None and cached[0] == fingerprint:
+            assumption_ids = cached[1]
+            self._assumption_ids.move_to_end(target_session_id)
+        else:
+            target_session = self._cached_session(target_session_id)
             if target_session is not None:
-                self._sessions[target_session_id] = target_session
+                assumption_ids = target_session.assumption_ids
             else:
-                return None, False
-
-        target_session = self._sessions[target_session_id]
-        if local_id not in target_session.all_assumptions:
+                # Only the IDs are needed, so skip decoding the full session
+                assumption_ids = _load_session_keys(target_session_id, fingerprint)
+            if assumption_ids is None:
+                # No sidecar matching the session files, e.g. saved before
+                # sidecars existed or cut short between the two writes
+                target_session = load_session(target_session_id)
+                if target_session is None:
+                    missing_sessions.add(target_session_id)
+                    return None, False
+                assumption_ids = target_session.assumption_ids
+            self._assumption_ids[target_session_id] = (fingerprint, assumption_ids)
+            self._assumption_ids.move_to_end(target_session_id)
+            if len(self._assumption_ids) > self._max_cached_sessions:
+                self._assumption_ids.popitem(last=False)
+
+        if local_id not in assumption_ids:
             return None, False
 
         return local_id, True
 
-    def process_thought(self, request: ThoughtRequest) -> ThoughtResponse:
+    def process_thought(
+        self, request: ThoughtRequest, *, auto_save: bool = True
+    ) -> ThoughtResponse:
+        """Add the requested thought to its session and describe the result.
+
+        With auto_save=False the session is not written until flush() is
+        called or it is evicted from the cache, so callers adding many
+        thoughts in one process can batch the writes.
+        """
         session_id, session = self._get_or_create_session(request.session_id)
 
-        if request.thought_number is None:
-            thought_number = session.thought_count + 1
-        else:
-            thought_number = request.thought_number
+        thought_number = (
+            session.thought_count + 1
+            if request.thought_number is None
+            else request.thought_number
+        )
+        # Same result as Thought.auto_adjust_total, without building a copy
+        total_thoughts = max(request.total_thoughts, thought_number)
+        next_thought_needed = (
+            thought_number < total_thoughts
+            if request.next_thought_needed is None
+            else request.next_thought_needed
+        )
 
-        if request.next_thought_needed is None:
-            next_thought_needed = thought_number < request.total_thoughts
-        else:
-            next_thought_needed = request.next_thought_needed
-
-        validated_cross_session_refs: list[str] = []
-        if request.depends_on_assumptions:
-            for assumption_id in request.depends_on_assumptions:
-                if ":" in assumption_id:
-                    _, was_resolved = self._resolve_cross_session_assumption(
-                        assumption_id, session_id
-                    )
-                    if was_resolved:
-                        validated_cross_session_refs.append(assumption_id)
+        # The request already ran the shared _ThoughtBase validation, so its
+        # validated values (including Assumption objects) are reused as-is
+        fields = {name: getattr(request, name) for name in _ThoughtBase.model_fields}
+        fields["total_thoughts"] = total_thoughts
+        thought = Thought.model_construct(
+            **fields,
+            thought_number=thought_number,
+            next_thought_needed=next_thought_needed,
+        )
 
-        thought_data = request.model_dump(exclude={"session_id"})
-        thought_data["thought_number"] = thought_number
-        thought_data["next_thought_needed"] = next_thought_needed
-        thought = Thought(**thought_data)
+        validated_cross_session_refs: set[str] = set()
+        # Not kept past this request: a missing session may be created later
+        missing_sessions: set[str] = set()
+        for assumption_id in thought._cross_session_dependencies:
+            _, was_resolved = self._resolve_cross_session_assumption(
+                assumption_id, missing_sessions
+            )
+            if was_resolved:
+                validated_cross_session_refs.add(assumption_id)
 
         session.add_thought(thought, validated_cross_session_refs)
-        save_session(session_id, session)
+        self._assumption_ids.pop(session_id, None)
+        if auto_save:
+            self._save(session_id, session)
 
-        return ThoughtResponse(
+        # Every value comes from validated models or fresh copies of session
+        # state, so re-running validation on the way out is pure overhead
+        return ThoughtResponse.model_construct(
             session_id=session_id,
             thought_number=thought.thought_number,
             total_thoughts=thought.total_thoughts,
@@ -850,7 +1544,7 @@ _service = UltraThinkService()
 
 def version_callback(value: bool) -> None:
     if value:
-        print(json.dumps({"version": __version__}))
+        print(_version_json())
         raise typer.Exit()
 
 